@@ -1,20 +1,29 @@
 import gpiod
+import os
 import time
 import threading
-import csv
+from array import array
 from datetime import datetime
 
+from hx711_driver import HX711, HX711SPI
+
 # === GPIO Pin Assignments ===
-RPWM_PIN = 27      # IBT-2 Right PWM (Retract)
-LPWM_PIN = 22      # IBT-2 Left PWM (Extend)
+RPWM_PIN = 19      # IBT-2 Right PWM (Retract), hardware PWM pin
+LPWM_PIN = 18      # IBT-2 Left PWM (Extend), hardware PWM pin
 EN_PIN = 17        # Motor driver enable pin
 DATA_PIN = 2       # HX711 Data pin
 CLOCK_PIN = 3      # HX711 Clock pin
+USE_SPI = False    # Read the HX711 over SPI instead (DATA→MISO GPIO9, CLOCK→MOSI GPIO10; see README)
 
 # === Calibration Parameters ===
 GRAM_CONVERSION = 75000   # Conversion factor (raw ADC → pounds)
 INITIAL_OFFSET = 25000    # Zero-load offset
 
+# === Hardware PWM (sysfs, needs the pwm-2chan overlay; see README) ===
+PWM_CHIP = 2              # RP1 PWM controller (check `ls /sys/class/pwm`)
+PWM_CHANNELS = {12: 0, 13: 1, 18: 2, 19: 3}   # Pi 5 GPIO -> PWM0 channel
+PWM_FREQUENCY = 1000      # Motor PWM frequency (Hz)
+
 # === Initialize GPIO Chip ===
 chip = gpiod.Chip('gpiochip0')
 
@@ -24,47 +33,44 @@ MAX_FORCE_DURATION = 3    # Hold time at maximum force (seconds)
 REPETITIONS = 10          # Number of test repetitions
 TEST_MODE = 1             # Mode: 1=gradual, 2=step, 3=sudden
 FIXED_DUTY = 1            # Fixed duty cycle for manual override
-
-
-# === HX711 Load Cell Interface ===
-class HX711:
-    """Interface for HX711 24-bit ADC (load cell amplifier)."""
-
-    def __init__(self, data_pin, clock_pin, chip):
-        self.data_line = chip.get_line(data_pin)
-        self.clock_line = chip.get_line(clock_pin)
-        self.data_line.request(consumer="hx711", type=gpiod.LINE_REQ_DIR_IN)
-        self.clock_line.request(consumer="hx711", type=gpiod.LINE_REQ_DIR_OUT)
-
-    def read(self):
-        """Read a single 24-bit sample from HX711."""
-        while self.data_line.get_value():
-            pass  # wait for chip ready
-        value = 0
-        for _ in range(24):
-            self.clock_line.set_value(1)
-            value = value << 1
-            self.clock_line.set_value(0)
-            if self.data_line.get_value():
-                value += 1
-        # 25th pulse sets gain/channel
-        self.clock_line.set_value(1)
-        self.clock_line.set_value(0)
-
-        # Convert to signed 24-bit integer
-        if value & 0x800000:
-            value |= ~((1 << 24) - 1)
-        return value
-
-    def power_down(self):
-        """Power down the HX711."""
-        self.clock_line.set_value(1)
-        time.sleep(0.00006)
-
-    def power_up(self):
-        """Wake up HX711 from power down."""
-        self.clock_line.set_value(0)
-        time.sleep(0.00006)
+VERBOSE_EVERY = 10        # Reader thread prints every Nth force sample (0 = never)
+DUTY_MAX = 1024           # Integer duty full scale (duty is carried as 0..DUTY_MAX counts)
+
+# === Real-Time Thread Placement (see README for isolcpus) ===
+READER_CPU = 2            # Isolated core for the HX711 reader/actuator thread
+RT_PRIORITY = 50          # SCHED_FIFO priority for that thread
+
+
+# === Hardware PWM Channel (kernel sysfs interface) ===
+class HardwarePWM:
+    """One channel of the Pi's hardware PWM peripheral via /sys/class/pwm."""
+
+    def __init__(self, chip, channel, frequency):
+        chip_dir = f"/sys/class/pwm/pwmchip{chip}"
+        self.path = f"{chip_dir}/pwm{channel}"
+        if not os.path.isdir(self.path):
+            with open(f"{chip_dir}/export", "w") as f:
+                f.write(str(channel))
+            # udev fixes up permissions on the new channel asynchronously
+            for _ in range(50):
+                if os.access(f"{self.path}/enable", os.W_OK):
+                    break
+                time.sleep(0.01)
+
+        self.period_ns = int(1e9 / frequency)
+        self._write("duty_cycle", 0)   # duty must never exceed the period
+        self._write("period", self.period_ns)
+        self._write("enable", 1)
+        self._duty_fd = os.open(f"{self.path}/duty_cycle", os.O_WRONLY)
+
+    def _write(self, name, value):
+        with open(f"{self.path}/{name}", "w") as f:
+            f.write(str(value))
+
+    def set_duty(self, duty):
+        """Set duty in integer counts (0..DUTY_MAX); the peripheral keeps generating it with no CPU work."""
+        duty_ns = self.period_ns * max(0, min(duty, DUTY_MAX)) // DUTY_MAX
+        os.pwrite(self._duty_fd, b"%d" % duty_ns, 0)
 
 
 # === Linear Actuator Driver (IBT-2) ===
@@ -72,14 +78,17 @@ class LinearActuator:
     """Controls a linear actuator via IBT-2 H-Bridge motor driver."""
 
     def __init__(self, rpwm_pin, lpwm_pin, en_pin, chip):
-        self.rpwm = chip.get_line(rpwm_pin)
-        self.lpwm = chip.get_line(lpwm_pin)
+        self.rpwm = HardwarePWM(PWM_CHIP, PWM_CHANNELS[rpwm_pin], PWM_FREQUENCY)
+        self.lpwm = HardwarePWM(PWM_CHIP, PWM_CHANNELS[lpwm_pin], PWM_FREQUENCY)
         self.enable = chip.get_line(en_pin)
 
-        self.rpwm.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
-        self.lpwm.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
         self.enable.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
 
+        # Command last programmed into the PWM, shared by every caller (reader
+        # thread, stop(), disable_motor()) so no writer can leave it stale
+        self._applied = None
+        self._drive_lock = threading.Lock()
+
     def enable_motor(self):
         """Enable the motor driver (EN=HIGH)."""
         self.enable.set_value(1)
@@ -88,111 +97,186 @@ class LinearActuator:
     def disable_motor(self):
         """Disable motor driver and stop actuator."""
         print("Stopping motor and disabling driver")
-        self.rpwm.set_value(0)
-        self.lpwm.set_value(0)
+        self.set_drive(0, 0)
         self.enable.set_value(0)
 
     def stop(self):
         """Stop actuator movement (both outputs LOW)."""
         print("Stopping motor")
-        self.rpwm.set_value(0)
-        self.lpwm.set_value(0)
-
-    def pwm_control_extend(self, duty_cycle, duration, frequency=100):
+        self.set_drive(0, 0)
+
+    def set_drive(self, direction, duty, always=False):
+        """
+        Set H-bridge drive: direction +1=extend, -1=retract, 0=stop; duty 0..DUTY_MAX.
+        The opposite side is zeroed first so both never drive at once.
+        The PWM registers are only written when the command changes, unless
+        `always` is set (used to re-assert the safety retract every sample).
+        """
+        if direction == 0 or duty <= 0:
+            direction, duty = 0, 0
+        with self._drive_lock:
+            if not always and (direction, duty) == self._applied:
+                return
+            if direction > 0:
+                self.rpwm.set_duty(0)
+                self.lpwm.set_duty(duty)
+            elif direction < 0:
+                self.lpwm.set_duty(0)
+                self.rpwm.set_duty(duty)
+            else:
+                self.rpwm.set_duty(0)
+                self.lpwm.set_duty(0)
+            self._applied = (direction, duty)
+
+    def pwm_control_extend(self, duty_cycle, duration):
         """Manually extend actuator using PWM for a set duration."""
-        period = 1.0 / frequency
-        high_time = period * duty_cycle
-        low_time = period - high_time
-        cycles = int(duration * frequency)
-
         print(f"Extending at {duty_cycle*100:.0f}% duty for {duration:.2f}s")
-        for _ in range(cycles):
-            self.rpwm.set_value(0)
-            self.lpwm.set_value(1)
-            time.sleep(high_time)
-            self.lpwm.set_value(0)
-            time.sleep(low_time)
-
-    def pwm_control_retract(self, duty_cycle, duration, frequency=100):
-        """Manually retract actuator using PWM for a set duration."""
-        period = 1.0 / frequency
-        high_time = period * duty_cycle
-        low_time = period - high_time
-        cycles = int(duration * frequency)
+        self.set_drive(1, round(duty_cycle * DUTY_MAX))
+        time.sleep(duration)
+        self.set_drive(0, 0)
 
+    def pwm_control_retract(self, duty_cycle, duration):
+        """Manually retract actuator using PWM for a set duration."""
         print(f"Retracting at {duty_cycle*100:.0f}% duty for {duration:.2f}s")
-        for _ in range(cycles):
-            self.rpwm.set_value(1)
-            self.lpwm.set_value(0)
-            time.sleep(high_time)
-            self.rpwm.set_value(0)
-            time.sleep(low_time)
+        self.set_drive(-1, round(duty_cycle * DUTY_MAX))
+        time.sleep(duration)
+        self.set_drive(0, 0)
 
 
 # === Shared State (accessed by multiple threads) ===
-current_force = 0.0     # latest measured force (pounds)
-current_duty = FIXED_DUTY
-current_dir = 0         # -1=retract, 0=stop, +1=extend
-_state_lock = threading.Lock()
+# One array('d') cell instead of a lock: single-element stores and loads are
+# atomic under the GIL, so readers always see a whole value.
+_FORCE, _REP, _TARGET = 0, 1, 2
+_NO_TARGET = float('nan')   # _state[_TARGET] value while nothing is being logged
+_state = array('d', [0.0, 0, _NO_TARGET])   # [force (lb), repetition, target logged to CSV (lb)]
+# Drive command as plain ints so the reader's change check is an integer compare
+_DIR, _DUTY = 0, 1
+_drive = array('i', [0, FIXED_DUTY * DUTY_MAX])   # [dir (-1=retract, 0=stop, +1=extend), duty (0..DUTY_MAX)]
+
+# === CSV Log Ring Buffer (single producer: reader thread, single consumer: writer thread) ===
+LOG_RING_SIZE = 4096            # must be a power of two
+CSV_BUFFER_BYTES = 1 << 20      # userspace write buffer for the run's CSV file
+CSV_ROW_MAX = 64                # bytes reserved per row in the writer's batch buffer
+_LOG_RING_MASK = LOG_RING_SIZE - 1
+_log_ring = [None] * LOG_RING_SIZE
+_log_head = array('Q', [0])     # advanced only by the producer
+_log_tail = array('Q', [0])     # advanced only by the consumer
+
+
+# === Loop Pacing ===
+def _sleep_until(deadline):
+    """
+    Sleep until a time.monotonic() deadline and return the deadline to schedule from.
+    Pacing loops do `next_t = _sleep_until(next_t + period)` so loop overhead does not
+    accumulate as drift; after an overrun the schedule restarts from now (no bursts).
+    """
+    now = time.monotonic()
+    if deadline > now:
+        time.sleep(deadline - now)
+        return deadline
+    return now
 
 
-# === Background Threads ===
-def read_force_continuous(hx, stop_event, mechanical_noise_factor=1, samples=1, period_s=0.01):
-    """Continuously read force from HX711 in a background thread."""
-    global current_force
-    while not stop_event.is_set():
-        reading = sum(hx.read() for _ in range(samples)) / samples
-        current_force = (reading - INITIAL_OFFSET) / (GRAM_CONVERSION * mechanical_noise_factor)
-        print(f"Measured force: {current_force:.2f} lb")
-        time.sleep(period_s)
+def _pin_current_thread(cpu, priority=RT_PRIORITY):
+    """Pin the calling thread to one CPU and run it SCHED_FIFO (needs root)."""
+    try:
+        os.sched_setaffinity(0, {cpu})
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError as e:   # PermissionError when not root, EINVAL for a missing CPU
+        print(f"[RT] Could not pin thread to CPU {cpu} with SCHED_FIFO ({e}); running unpinned")
 
 
-def actuator_pwm_loop(actuator, stop_event, frequency=50, force_threshold=-100):
+# === Background Threads ===
+def read_force_continuous(
+    hx, actuator, stop_event, mechanical_noise_factor=1, samples=1, period_s=0.01, force_threshold=-100
+):
     """
-    Continuously drive actuator with PWM.
-    Includes safety override: retract if force exceeds threshold.
+    Continuously read force from HX711 and drive the actuator from the same thread.
+    After each sample the shared (direction, duty) is handed to set_drive(), which
+    only touches the hardware PWM when it changes. Includes safety override: retract if force exceeds threshold.
     """
-    global current_force, current_dir, current_duty
-    period = 1.0 / frequency
-
-    while not stop_event.is_set():
-        with _state_lock:
-            duty = current_duty
-            direction = current_dir
-            force = current_force
-
-        # --- Safety override ---
+    _pin_current_thread(READER_CPU)
+    inv_k = 1.0 / (GRAM_CONVERSION * mechanical_noise_factor)   # hoisted: multiply, not divide
+    count = 0
+    tripped = False  # safety override already fired for this excursion
+
+    # Bind per-iteration attribute lookups to locals once
+    read_mean = hx.read_mean
+    set_drive = actuator.set_drive
+    monotonic = time.monotonic
+    stopped = stop_event.is_set
+
+    next_t = monotonic()
+    while not stopped():
+        force = (read_mean(samples) - INITIAL_OFFSET) * inv_k
+        _state[_FORCE] = force
+        count += 1
+        if VERBOSE_EVERY and count % VERBOSE_EVERY == 0:
+            print(f"Measured force: {force:.2f} lb")
+
+        # --- Safety override (local only: _drive still holds the feedback command,
+        # which takes back over once force is inside the threshold again) ---
         if force < force_threshold:
-            print(f"[SAFETY] Force {force:.2f} lb > {force_threshold} lb! RETRACTING.")
-            with _state_lock:
-                current_dir = -1     # retract
-                current_duty = 1.0   # full duty
-            duty = 1.0
-            direction = -1
-
-        # --- No motion case ---
-        if duty <= 0 or direction == 0:
-            actuator.rpwm.set_value(0)
-            actuator.lpwm.set_value(0)
-            time.sleep(period)
-            continue
-
-        # --- PWM drive (extend/retract) ---
-        high_time = period * max(0.0, min(duty, 1.0))
-        low_time = period - high_time
-
-        if direction > 0:  # extend
-            actuator.rpwm.set_value(0)
-            actuator.lpwm.set_value(1)
-            time.sleep(high_time)
-            actuator.lpwm.set_value(0)
-            time.sleep(low_time)
-        else:              # retract
-            actuator.rpwm.set_value(1)
-            actuator.lpwm.set_value(0)
-            time.sleep(high_time)
-            actuator.rpwm.set_value(0)
-            time.sleep(low_time)
+            if not tripped:
+                print(f"[SAFETY] Force {force:.2f} lb > {force_threshold} lb! RETRACTING.")
+                tripped = True
+            # Full-duty retract written every sample, whatever else touched the PWM
+            set_drive(-1, DUTY_MAX, always=True)
+        else:
+            tripped = False
+            # --- Update PWM registers (set_drive skips unchanged commands) ---
+            set_drive(_drive[_DIR], _drive[_DUTY])
+
+        # --- Hand the sample to the CSV writer (no lock, one index bump) ---
+        target = _state[_TARGET]
+        if target == target:   # NaN (_NO_TARGET) compares unequal: not logging
+            head = _log_head[0]
+            if head - _log_tail[0] < LOG_RING_SIZE:   # ring full: drop rather than overwrite
+                _log_ring[head & _LOG_RING_MASK] = (monotonic(), force, target, _state[_REP])
+                _log_head[0] = head + 1
+        next_t = _sleep_until(next_t + period_s)
+
+
+def csv_writer_loop(csv_file, start_time, stop_event, batch_rows=128, period_s=0.05):
+    """Drain the log ring into csv_file (opened binary), one write() per batch of rows."""
+    # Discard anything queued before the writer started
+    tail = _log_head[0]
+    _log_tail[0] = tail
+
+    # Preallocated once; rows are slice-assigned at offset n and written as a
+    # memoryview, so the buffer is never resized or copied. Each row costs one
+    # bytes object from the %-format.
+    capacity = batch_rows * CSV_ROW_MAX
+    buf = bytearray(capacity)
+    view = memoryview(buf)
+    last_tgt = last_rep = None
+    tail_col = b""      # encoded ",<target>,<rep>\n", rebuilt only when either changes
+
+    next_t = time.monotonic()
+    while True:
+        stopping = stop_event.is_set()
+        head = _log_head[0]
+        while tail < head:
+            end = min(head, tail + batch_rows)
+            n = 0
+            for i in range(tail, end):
+                t, f, tgt, rep = _log_ring[i & _LOG_RING_MASK]
+                if tgt != last_tgt or rep != last_rep:
+                    tail_col = f",{tgt:g},{rep:g}\n".encode()
+                    last_tgt, last_rep = tgt, rep
+                row = b"%.4f,%.3f%s" % (t - start_time, f, tail_col)
+                k = n + len(row)
+                if k > capacity:   # only for absurdly wide rows; flush and restart
+                    csv_file.write(view[:n])
+                    n, k = 0, len(row)
+                buf[n:k] = row
+                n = k
+            csv_file.write(view[:n])
+            tail = end
+            _log_tail[0] = tail
+        if stopping:
+            break
+        next_t = _sleep_until(next_t + period_s)
 
 
 # === Feedback Controller (P-control) ===
@@ -202,118 +286,112 @@ def feedback_extend_to_target(
     """
     Move actuator until target force is reached using proportional control.
     Stops when within tolerance or after timeout.
+    Error is carried in milli-pounds and duty in 0..DUTY_MAX counts (integer math).
     """
-    global current_dir, current_duty
-
     actuator.enable_motor()
     print(f"[Feedback] Driving until target ~{target_force} lb (Kp={Kp})")
 
-    start_ts = time.time()
+    tolerance_mlb = int(tolerance * 1000)
+    kp_q16 = round(Kp * DUTY_MAX * 65536 / 1000)   # duty counts per milli-pound, Q16 fixed point
+    start_ts = time.monotonic()
+    next_t = start_ts
+    last_dir = last_duty = None   # command last written to _drive
 
     try:
         while True:
-            error = target_force - current_force
+            force = _state[_FORCE]
+            error_mlb = int((target_force - force) * 1000)
 
             # --- Stop if within tolerance ---
-            if abs(error) <= tolerance:
-                with _state_lock:
-                    current_dir = 0
-                    current_duty = 0
-                print(f"[Feedback] Target reached: {current_force:.2f} lb")
+            if abs(error_mlb) <= tolerance_mlb:
+                _drive[_DIR] = 0
+                _drive[_DUTY] = 0
+                print(f"[Feedback] Target reached: {force:.2f} lb")
                 break
 
             # --- Timeout safety ---
-            if (time.time() - start_ts) > max_seconds:
-                with _state_lock:
-                    current_dir = 0
-                    current_duty = 0
+            if (time.monotonic() - start_ts) > max_seconds:
+                _drive[_DIR] = 0
+                _drive[_DUTY] = 0
                 print("[Feedback] Timeout reached, stopping")
                 break
 
             # --- P-control (duty proportional to error) ---
-            duty = min(1.0, Kp * abs(error))   # clamp at 100%
-            direction = -1 if error > 0 else 1  # extend if target > force, else retract
+            duty = min(DUTY_MAX, (abs(error_mlb) * kp_q16) >> 16)   # clamp at 100%
+            direction = -1 if error_mlb > 0 else 1  # extend if target > force, else retract
 
-            with _state_lock:
-                current_dir = direction
-                current_duty = duty
+            # --- Publish only when the command changes ---
+            if duty != last_duty or direction != last_dir:
+                _drive[_DIR] = direction
+                _drive[_DUTY] = duty
+                last_dir, last_duty = direction, duty
+                print(f"[Feedback] error={error_mlb / 1000:.2f}, duty={duty / DUTY_MAX:.3f}, dir={direction}")
 
-            print(f"[Feedback] error={error:.2f}, duty={duty:.2f}, dir={direction}")
-
-            time.sleep(update_interval)
+            next_t = _sleep_until(next_t + update_interval)
 
     finally:
-        with _state_lock:
-            current_dir = 0
-            current_duty = 0
+        _drive[_DIR] = 0
+        _drive[_DUTY] = 0
         actuator.stop()
 
 
 # === Main Entry Point ===
 if __name__ == "__main__":
     actuator = LinearActuator(RPWM_PIN, LPWM_PIN, EN_PIN, chip)
-    hx = HX711(DATA_PIN, CLOCK_PIN, chip)
+    hx = HX711SPI() if USE_SPI else HX711(DATA_PIN, CLOCK_PIN, chip)
 
     # Sequence of target forces for testing (negative = compression load)
     TARGET_FORCES = [-1, -2, -3, -4, -3, -2, -1]
 
     try:
-        # --- Start background threads ---
+        # --- Start background thread (HX711 reads + PWM updates) ---
         read_stop_event = threading.Event()
-        actuator_stop_event = threading.Event()
 
         reader_thread = threading.Thread(
-            target=read_force_continuous, args=(hx, read_stop_event)
+            target=read_force_continuous, args=(hx, actuator, read_stop_event)
         )
         reader_thread.start()
 
-        actuator_thread = threading.Thread(
-            target=actuator_pwm_loop, args=(actuator, actuator_stop_event)
-        )
-        actuator_thread.start()
-
-        # --- Perform test repetitions ---
-        for rep in range(1, REPETITIONS + 1):
-            current_time = datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
-            filename = f"autopusher_feedback_seq_rep{rep}_{current_time}.csv"
-
-            with open(filename, mode='w', newline='') as csv_file:
-                csv_writer = csv.writer(csv_file)
-                csv_writer.writerow(['Time (s)', 'Force (lb)', 'Target (lb)'])
-                start_time = time.time()
-
-                # logger thread to save data to CSV
-                log_stop_event = threading.Event()
-                def logger():
-                    while not log_stop_event.is_set():
-                        timestamp = time.time() - start_time
-                        with _state_lock:
-                            f = current_force
-                        current_target = target_holder[0] if target_holder else None
-                        csv_writer.writerow([timestamp, f, current_target])
-                        time.sleep(0.01)
-
-                target_holder = [None]  # shared mutable holder for current target
-                logger_thread = threading.Thread(target=logger)
-                logger_thread.start()
-
-                print(f"\n=== Starting repetition {rep}/{REPETITIONS} (Sequential targets) ===")
-
-                # Sequentially go through all targets
-                for tgt in TARGET_FORCES:
-                    target_holder[0] = tgt
-                    print(f"\n[Sequence] Moving to target {tgt} lb")
-                    feedback_extend_to_target(actuator, tgt)
-
-                # stop logger after sequence
+        # --- One CSV for the whole run (Rep column tells repetitions apart) ---
+        current_time = datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
+        filename = f"autopusher_feedback_seq_{current_time}.csv"
+
+        with open(filename, mode='wb', buffering=CSV_BUFFER_BYTES) as csv_file:
+            csv_file.write(b"Time (s),Force (lb),Target (lb),Rep\n")
+            start_time = time.monotonic()
+
+            # writer thread drains the reader's samples into the CSV for the whole run
+            log_stop_event = threading.Event()
+            logger_thread = threading.Thread(
+                target=csv_writer_loop, args=(csv_file, start_time, log_stop_event)
+            )
+            logger_thread.start()
+
+            try:
+                # --- Perform test repetitions ---
+                for rep in range(1, REPETITIONS + 1):
+                    _state[_REP] = rep
+                    print(f"\n=== Starting repetition {rep}/{REPETITIONS} (Sequential targets) ===")
+
+                    # Sequentially go through all targets
+                    for tgt in TARGET_FORCES:
+                        _state[_TARGET] = tgt
+                        print(f"\n[Sequence] Moving to target {tgt} lb")
+                        feedback_extend_to_target(actuator, tgt)
+
+                    # no rows between repetitions
+                    _state[_TARGET] = _NO_TARGET
+            finally:
+                # stop logger once per run (it drains the ring first)
+                _state[_TARGET] = _NO_TARGET
                 log_stop_event.set()
                 logger_thread.join()
+                csv_file.flush()
+                os.fsync(csv_file.fileno())
 
-        # --- Stop background threads ---
+        # --- Stop background thread ---
         read_stop_event.set()
-        actuator_stop_event.set()
         reader_thread.join()
-        actuator_thread.join()
 
     except KeyboardInterrupt:
         print("Interrupted by user.")
@@ -1,6 +1,8 @@
 import time
 import gpiod
 
+_SIGN_BIT = 0x800000  # bit 23: sign of the two's-complement 24-bit sample
+
 # === HX711 Load Cell Amplifier Interface ===
 class HX711:
     """
@@ -38,29 +40,27 @@ class HX711:
         Returns:
             int: Signed 24-bit raw value from ADC.
         """
+        # Bind the line methods once instead of looking them up per bit
+        get_data = self.data_line.get_value
+        set_clock = self.clock_line.set_value
+
         # Wait until HX711 is ready (DOUT goes LOW)
-        while self.data_line.get_value():
+        while get_data():
             pass
 
         value = 0
         for i in range(24):
             # Pulse clock to shift in one bit
-            self.clock_line.set_value(1)
-            value = value << 1
-            self.clock_line.set_value(0)
-
-            if self.data_line.get_value():
-                value += 1
+            set_clock(1)
+            set_clock(0)
+            value = (value << 1) | get_data()
 
         # Extra clock pulse to set gain/channel
-        self.clock_line.set_value(1)
-        self.clock_line.set_value(0)
-
-        # Convert unsigned 24-bit to signed integer
-        if value & 0x800000:
-            value |= ~((1 << 24) - 1)
+        set_clock(1)
+        set_clock(0)
 
-        return value
+        # Convert unsigned 24-bit to signed integer (branchless sign extension)
+        return (value ^ _SIGN_BIT) - _SIGN_BIT
 
     def power_down(self):
         """Power down HX711 (clock HIGH for >60 µs)."""
@@ -90,7 +90,7 @@ def print_force_readings():
     initial_offset = INITIAL_OFFSET
     skin_offset = 0
     total_offset = initial_offset + skin_offset
-    gram_conversion = GRAM_CONVERSION
+    inv_conversion = 1.0 / GRAM_CONVERSION   # multiply per sample instead of divide
 
     try:
         start_time = time.time()
@@ -99,7 +99,7 @@ def print_force_readings():
             elapsed_time = time.time() - start_time
 
             # Convert raw ADC value → grams
-            weight = (raw_value - total_offset) / gram_conversion
+            weight = (raw_value - total_offset) * inv_conversion
 
             print(f"{elapsed_time:.2f} seconds, current reading (g): {weight:.2f}")
             time.sleep(0.01)  # Sampling rate (100 Hz max here)
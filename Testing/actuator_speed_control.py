@@ -1,51 +1,77 @@
 import gpiod
+import os
 import time
 
 # === GPIO Setup ===
-# Using gpiod (libgpiod) to control Raspberry Pi GPIO lines
+# Using gpiod (libgpiod) for the enable pin; speed comes from the hardware PWM
 chip = gpiod.Chip('gpiochip0')
 
 # GPIO pin assignments (connected to IBT-2 motor driver)
-RPWM_PIN = 27  # Right PWM input (controls direction/speed)
-LPWM_PIN = 22  # Left PWM input (controls direction/speed)
+RPWM_PIN = 19  # Right PWM input (controls direction/speed), hardware PWM pin
+LPWM_PIN = 18  # Left PWM input (controls direction/speed), hardware PWM pin
 EN_PIN   = 17  # Enable pin (L_EN and R_EN tied together)
 
-# === Get GPIO lines ===
-rpwm = chip.get_line(RPWM_PIN)
-lpwm = chip.get_line(LPWM_PIN)
+# === Hardware PWM Setup ===
+# Needs the pwm-2chan overlay in /boot/firmware/config.txt (see main README)
+PWM_CHIP = 2                      # RP1 PWM controller (check `ls /sys/class/pwm`)
+PWM_CHANNELS = {18: 2, 19: 3}     # Pi 5 GPIO -> PWM0 channel
+PWM_FREQUENCY = 1000              # PWM frequency (Hz)
+
+
+class HardwarePWM:
+    """One channel of the Pi's hardware PWM peripheral via /sys/class/pwm."""
+
+    def __init__(self, chip, channel, frequency):
+        chip_dir = f"/sys/class/pwm/pwmchip{chip}"
+        self.path = f"{chip_dir}/pwm{channel}"
+        if not os.path.isdir(self.path):
+            with open(f"{chip_dir}/export", "w") as f:
+                f.write(str(channel))
+            # udev fixes up permissions on the new channel asynchronously
+            for _ in range(50):
+                if os.access(f"{self.path}/enable", os.W_OK):
+                    break
+                time.sleep(0.01)
+
+        self.period_ns = int(1e9 / frequency)
+        self._write("duty_cycle", 0)   # duty must never exceed the period
+        self._write("period", self.period_ns)
+        self._write("enable", 1)
+
+    def _write(self, name, value):
+        with open(f"{self.path}/{name}", "w") as f:
+            f.write(str(value))
+
+    def set_duty(self, duty):
+        """Set duty cycle (0-1)."""
+        self._write("duty_cycle", int(self.period_ns * max(0.0, min(duty, 1.0))))
+
+
+# === Get GPIO lines / PWM channels ===
+rpwm = HardwarePWM(PWM_CHIP, PWM_CHANNELS[RPWM_PIN], PWM_FREQUENCY)
+lpwm = HardwarePWM(PWM_CHIP, PWM_CHANNELS[LPWM_PIN], PWM_FREQUENCY)
 enable = chip.get_line(EN_PIN)
 
-# Configure pins as outputs
-rpwm.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
-lpwm.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
+# Configure enable pin as output
 enable.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
 
-def software_pwm(pin_high, pin_low, duty_cycle, duration, frequency=100):
+def hardware_pwm(pwm_high, pwm_low, duty_cycle, duration):
     """
-    Software PWM to control motor speed.
-    
+    Hardware PWM to control motor speed.
+
     Args:
-        pin_high: GPIO line to drive HIGH for motion.
-        pin_low: GPIO line to hold LOW (opposite side).
+        pwm_high: PWM channel driven at duty_cycle for motion.
+        pwm_low: PWM channel held at 0% (opposite side).
         duty_cycle: Fraction (0–1) of ON time per cycle.
         duration: Total time (s) to run PWM.
-        frequency: PWM frequency (Hz).
     """
-    period = 1.0 / frequency          # Length of one PWM cycle
-    high_time = period * duty_cycle   # Time motor is ON per cycle
-    low_time = period - high_time     # Time motor is OFF per cycle
-    cycles = int(duration * frequency)
-
-    for _ in range(cycles):
-        # Motor ON (forward/reverse depending on which pin is high)
-        pin_high.set_value(1)
-        pin_low.set_value(0)
-        time.sleep(high_time)
-
-        # Motor OFF (both LOW)
-        pin_high.set_value(0)
-        pin_low.set_value(0)
-        time.sleep(low_time)
+    # Zero the opposite side first so both never drive at once
+    pwm_low.set_duty(0)
+    pwm_high.set_duty(duty_cycle)
+    time.sleep(duration)   # the peripheral generates the waveform meanwhile
+
+    # Motor OFF (both 0%)
+    pwm_high.set_duty(0)
 
 try:
     # --- Enable motor driver ---
@@ -57,23 +83,22 @@ try:
 
     # Sweep through speeds in DOWN and UP directions
     for duty, label in speeds:
-        # DOWN movement (RPWM HIGH, LPWM LOW)
+        # DOWN movement (RPWM active, LPWM LOW)
         print(f"\nMoving DOWN at {label} speed")
-        software_pwm(rpwm, lpwm, duty_cycle=duty, duration=3)
+        hardware_pwm(rpwm, lpwm, duty_cycle=duty, duration=3)
 
         time.sleep(1)  # pause before reversing
 
-        # UP movement (LPWM HIGH, RPWM LOW)
+        # UP movement (LPWM active, RPWM LOW)
         print(f"Moving UP at {label} speed")
-        software_pwm(lpwm, rpwm, duty_cycle=duty, duration=3)
+        hardware_pwm(lpwm, rpwm, duty_cycle=duty, duration=3)
 
         time.sleep(1)  # pause before changing speed
 
 finally:
     # --- Stop motor and cleanup ---
     print("\nStopping motor and disabling driver")
-    rpwm.set_value(0)
-    lpwm.set_value(0)
+    rpwm.set_duty(0)
+    lpwm.set_duty(0)
     enable.set_value(0)
     chip.close()  # release GPIO resources
-
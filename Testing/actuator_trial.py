@@ -6,18 +6,23 @@ import time
 chip = gpiod.Chip('gpiochip0')
 
 # Pin assignments for IBT-2 motor driver
-RPWM_PIN = 27  # Right PWM input (controls one side of H-bridge)
-LPWM_PIN = 22  # Left PWM input (controls other side of H-bridge)
+RPWM_PIN = 19  # Right PWM input (controls one side of H-bridge)
+LPWM_PIN = 18  # Left PWM input (controls other side of H-bridge)
 EN_PIN   = 17  # Enable pin (L_EN and R_EN tied together)
 
+# Precomputed [RPWM, LPWM] patterns (tuples, so no allocation per switch)
+DRIVE_STOP = (0, 0)       # both LOW = motor stop
+DRIVE_BACKWARD = (1, 0)
+DRIVE_FORWARD = (0, 1)
+
 # === Request GPIO Lines ===
-rpwm = chip.get_line(RPWM_PIN)
-lpwm = chip.get_line(LPWM_PIN)
+# RPWM and LPWM are one bulk request so both switch in a single ioctl,
+# never leaving a window where the two H-bridge sides disagree
+drive = chip.get_lines([RPWM_PIN, LPWM_PIN])
 enable = chip.get_line(EN_PIN)
 
 # Configure pins as outputs
-rpwm.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
-lpwm.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
+drive.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT, default_vals=list(DRIVE_STOP))
 enable.request(consumer="ibt2", type=gpiod.LINE_REQ_DIR_OUT)
 
 try:
@@ -28,21 +33,18 @@ try:
     # --- Move actuator/motor backward ---
     # IBT-2 logic: drive one side HIGH, the other LOW
     print("Moving backward (RPWM HIGH, LPWM LOW)")
-    rpwm.set_value(1)
-    lpwm.set_value(0)
+    drive.set_values(DRIVE_BACKWARD)
     time.sleep(5)  # run for 5 seconds
 
     # --- Move actuator/motor forward ---
     print("Moving forward (LPWM HIGH, RPWM LOW)")
-    rpwm.set_value(0)
-    lpwm.set_value(1)
+    drive.set_values(DRIVE_FORWARD)
     time.sleep(5)  # run for 5 seconds
 
 finally:
     # --- Stop motor and cleanup ---
     print("Stopping motor and disabling driver")
-    rpwm.set_value(0)   # both LOW = motor stop
-    lpwm.set_value(0)
+    drive.set_values(DRIVE_STOP)
     enable.set_value(0) # disable driver
     chip.close()        # release GPIO resources
 
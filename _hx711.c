@@ -0,0 +1,282 @@
+/*
+ * _hx711.c - native HX711 bit-bang over the Linux GPIO character device (v2 uAPI).
+ *
+ * Clocking the HX711 from Python costs one gpiod call per edge, which on the
+ * Pi 5 can stretch PD_SCK HIGH past the chip's 60 us power-down limit. This
+ * extension requests the DATA/CLOCK lines itself and runs the 24-bit shift
+ * loop in C with one ioctl per edge. DATA is requested with falling-edge
+ * detection so the ready wait sleeps in poll() instead of spinning in Python.
+ *
+ * Build (from the repository root):
+ *   gcc -O2 -shared -fPIC $(python3-config --includes) _hx711.c \
+ *       -o _hx711$(python3-config --extension-suffix)
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <errno.h>
+#include <fcntl.h>
+#include <poll.h>
+#include <string.h>
+#include <sys/ioctl.h>
+#include <unistd.h>
+#include <linux/gpio.h>
+
+/* === Line requests === */
+
+static int request_line(int chip_fd, unsigned int offset, uint64_t flags, const char *consumer)
+{
+    struct gpio_v2_line_request req;
+
+    memset(&req, 0, sizeof(req));
+    req.offsets[0] = offset;
+    req.num_lines = 1;
+    req.config.flags = flags;
+    strncpy(req.consumer, consumer, GPIO_MAX_NAME_SIZE - 1);
+
+    if (ioctl(chip_fd, GPIO_V2_GET_LINE_IOCTL, &req) < 0)
+        return -1;
+    return req.fd;
+}
+
+static PyObject *hx711_request_lines(PyObject *self, PyObject *args)
+{
+    const char *chip_path;
+    const char *consumer = "hx711";
+    unsigned int data_pin, clock_pin;
+    int chip_fd, data_fd, clock_fd;
+
+    if (!PyArg_ParseTuple(args, "sII|s", &chip_path, &data_pin, &clock_pin, &consumer))
+        return NULL;
+
+    chip_fd = open(chip_path, O_RDONLY | O_CLOEXEC);
+    if (chip_fd < 0)
+        return PyErr_SetFromErrnoWithFilename(PyExc_OSError, chip_path);
+
+    data_fd = request_line(chip_fd, data_pin,
+                           GPIO_V2_LINE_FLAG_INPUT | GPIO_V2_LINE_FLAG_EDGE_FALLING, consumer);
+    if (data_fd < 0) {
+        PyErr_SetFromErrno(PyExc_OSError);
+        close(chip_fd);
+        return NULL;
+    }
+    clock_fd = request_line(chip_fd, clock_pin, GPIO_V2_LINE_FLAG_OUTPUT, consumer);
+    if (clock_fd < 0) {
+        PyErr_SetFromErrno(PyExc_OSError);
+        close(data_fd);
+        close(chip_fd);
+        return NULL;
+    }
+
+    /* Line request fds stay valid after the chip fd is closed */
+    close(chip_fd);
+    return Py_BuildValue("(ii)", data_fd, clock_fd);
+}
+
+/* === Single-line value access (for ready polling and power up/down) === */
+
+static PyObject *hx711_get_value(PyObject *self, PyObject *args)
+{
+    int fd;
+    struct gpio_v2_line_values vals = {.bits = 0, .mask = 1};
+
+    if (!PyArg_ParseTuple(args, "i", &fd))
+        return NULL;
+    if (ioctl(fd, GPIO_V2_LINE_GET_VALUES_IOCTL, &vals) < 0)
+        return PyErr_SetFromErrno(PyExc_OSError);
+    return PyLong_FromLong((long)(vals.bits & 1));
+}
+
+static PyObject *hx711_set_value(PyObject *self, PyObject *args)
+{
+    int fd, value;
+    struct gpio_v2_line_values vals = {.bits = 0, .mask = 1};
+
+    if (!PyArg_ParseTuple(args, "ii", &fd, &value))
+        return NULL;
+    vals.bits = value ? 1 : 0;
+    if (ioctl(fd, GPIO_V2_LINE_SET_VALUES_IOCTL, &vals) < 0)
+        return PyErr_SetFromErrno(PyExc_OSError);
+    Py_RETURN_NONE;
+}
+
+/* === Ready wait (DATA falling edge) === */
+
+/* Returns 1 when DATA is LOW, 0 on timeout or signal, -1 on error (errno set). */
+static int wait_data_low(int data_fd, int timeout_ms)
+{
+    struct pollfd pfd = {.fd = data_fd, .events = POLLIN};
+    struct gpio_v2_line_values vals = {.bits = 0, .mask = 1};
+    struct gpio_v2_line_event event;
+    int ret;
+
+    /* Drop edges queued while the previous sample was being clocked out */
+    while ((ret = poll(&pfd, 1, 0)) > 0) {
+        if (read(data_fd, &event, sizeof(event)) < 0)
+            return -1;
+    }
+    if (ret < 0)
+        return errno == EINTR ? 0 : -1;
+
+    /* Conversion may already be complete */
+    if (ioctl(data_fd, GPIO_V2_LINE_GET_VALUES_IOCTL, &vals) < 0)
+        return -1;
+    if (!(vals.bits & 1))
+        return 1;
+
+    ret = poll(&pfd, 1, timeout_ms);
+    if (ret < 0)
+        return errno == EINTR ? 0 : -1;
+    if (ret == 0)
+        return 0;
+    if (read(data_fd, &event, sizeof(event)) < 0)
+        return -1;
+    return 1;
+}
+
+static PyObject *hx711_wait_ready(PyObject *self, PyObject *args)
+{
+    int data_fd, ret, timeout_ms;
+    double timeout = -1.0;
+
+    if (!PyArg_ParseTuple(args, "i|d", &data_fd, &timeout))
+        return NULL;
+    timeout_ms = timeout < 0 ? -1 : (int)(timeout * 1000.0);
+
+    Py_BEGIN_ALLOW_THREADS
+    ret = wait_data_low(data_fd, timeout_ms);
+    Py_END_ALLOW_THREADS
+
+    if (ret < 0)
+        return PyErr_SetFromErrno(PyExc_OSError);
+    if (PyErr_CheckSignals() < 0)
+        return NULL;
+    return PyBool_FromLong(ret);
+}
+
+/* === 24-bit readout === */
+
+/* Clock out one sample into *out. Returns 0, or -1 on error (errno set). */
+static int read_sample_c(int data_fd, int clock_fd, int32_t *out)
+{
+    int i;
+    int32_t value = 0;
+    struct gpio_v2_line_values hi = {.bits = 1, .mask = 1};
+    struct gpio_v2_line_values lo = {.bits = 0, .mask = 1};
+    struct gpio_v2_line_values in = {.bits = 0, .mask = 1};
+
+    for (i = 0; i < 24; i++) {
+        if (ioctl(clock_fd, GPIO_V2_LINE_SET_VALUES_IOCTL, &hi) < 0)
+            return -1;
+        value <<= 1;
+        if (ioctl(clock_fd, GPIO_V2_LINE_SET_VALUES_IOCTL, &lo) < 0)
+            return -1;
+        if (ioctl(data_fd, GPIO_V2_LINE_GET_VALUES_IOCTL, &in) < 0)
+            return -1;
+        value |= (int32_t)(in.bits & 1);
+    }
+
+    /* 25th pulse sets gain/channel (channel A, gain 128) */
+    if (ioctl(clock_fd, GPIO_V2_LINE_SET_VALUES_IOCTL, &hi) < 0)
+        return -1;
+    if (ioctl(clock_fd, GPIO_V2_LINE_SET_VALUES_IOCTL, &lo) < 0)
+        return -1;
+
+    /* Convert to signed 24-bit integer (branchless sign extension) */
+    *out = (value ^ 0x800000) - 0x800000;
+    return 0;
+}
+
+static PyObject *hx711_read_sample(PyObject *self, PyObject *args)
+{
+    int data_fd, clock_fd, ret;
+    int32_t value;
+
+    if (!PyArg_ParseTuple(args, "ii", &data_fd, &clock_fd))
+        return NULL;
+
+    /* No Python objects are touched while clocking, so other threads may run */
+    Py_BEGIN_ALLOW_THREADS
+    ret = read_sample_c(data_fd, clock_fd, &value);
+    Py_END_ALLOW_THREADS
+
+    if (ret < 0)
+        return PyErr_SetFromErrno(PyExc_OSError);
+    return PyLong_FromLong((long)value);
+}
+
+/* === Oversampling (whole reduction in C) === */
+
+static PyObject *hx711_read_samples_mean(PyObject *self, PyObject *args)
+{
+    int data_fd, clock_fd, n, i = 0, ret = 1, timeout_ms;
+    double timeout = -1.0;
+    int32_t value;
+    int64_t acc = 0;
+
+    if (!PyArg_ParseTuple(args, "iii|d", &data_fd, &clock_fd, &n, &timeout))
+        return NULL;
+    if (n < 1) {
+        PyErr_SetString(PyExc_ValueError, "n must be at least 1");
+        return NULL;
+    }
+    timeout_ms = timeout < 0 ? -1 : (int)(timeout * 1000.0);
+
+    /* The loop only leaves the GIL-free section on error, timeout or signal */
+    while (i < n) {
+        Py_BEGIN_ALLOW_THREADS
+        for (; i < n; i++) {
+            ret = wait_data_low(data_fd, timeout_ms);
+            if (ret <= 0)
+                break;
+            if (read_sample_c(data_fd, clock_fd, &value) < 0) {
+                ret = -1;
+                break;
+            }
+            acc += value;
+        }
+        Py_END_ALLOW_THREADS
+
+        if (ret < 0)
+            return PyErr_SetFromErrno(PyExc_OSError);
+        if (PyErr_CheckSignals() < 0)
+            return NULL;
+        if (ret == 0 && timeout >= 0) {
+            PyErr_SetString(PyExc_TimeoutError, "HX711 not ready before timeout (DATA line stuck HIGH)");
+            return NULL;
+        }
+    }
+    return PyFloat_FromDouble((double)acc / n);
+}
+
+static PyMethodDef hx711_methods[] = {
+    {"request_lines", hx711_request_lines, METH_VARARGS,
+     "request_lines(chip_path, data_pin, clock_pin, consumer='hx711') -> (data_fd, clock_fd)\n"
+     "Request DATA as input and CLOCK as output; returns the line-request fds."},
+    {"get_value", hx711_get_value, METH_VARARGS,
+     "get_value(fd) -> int\nRead the level of a single-line request."},
+    {"set_value", hx711_set_value, METH_VARARGS,
+     "set_value(fd, value)\nDrive a single-line output request."},
+    {"wait_ready", hx711_wait_ready, METH_VARARGS,
+     "wait_ready(data_fd, timeout=-1.0) -> bool\n"
+     "Sleep until DATA goes LOW (conversion ready); False on timeout.\n"
+     "Releases the GIL while waiting. A negative timeout waits forever."},
+    {"read_sample", hx711_read_sample, METH_VARARGS,
+     "read_sample(data_fd, clock_fd) -> int\n"
+     "Clock out one 24-bit sample (plus the gain pulse) and return it signed.\n"
+     "The caller must wait for DATA to go LOW first. Releases the GIL while clocking."},
+    {"read_samples_mean", hx711_read_samples_mean, METH_VARARGS,
+     "read_samples_mean(data_fd, clock_fd, n, timeout=-1.0) -> float\n"
+     "Wait for and read n samples, returning their mean. Releases the GIL\n"
+     "throughout; raises TimeoutError if a single ready wait exceeds timeout."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef hx711_module = {
+    PyModuleDef_HEAD_INIT, "_hx711", "Native HX711 readout over the GPIO v2 uAPI.", -1, hx711_methods
+};
+
+PyMODINIT_FUNC PyInit__hx711(void)
+{
+    return PyModule_Create(&hx711_module);
+}
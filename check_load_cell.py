@@ -2,98 +2,63 @@ import gpiod
 import time
 from datetime import datetime
 
+from hx711_driver import HX711, HX711SPI
+
 # === GPIO Pin Assignments ===
 DATA_PIN = 2       # HX711 Data pin
 CLOCK_PIN = 3       # HX711 Clock pin
+USE_SPI = False     # Read the HX711 over SPI instead (DATA→MISO GPIO9, CLOCK→MOSI GPIO10; see README)
 
 # === Calibration Parameters ===
 GRAM_CONVERSION = 75000   # Conversion factor (raw ADC → pounds)
 INITIAL_OFFSET = 25000    # Zero-load offset
+_INV_CONV = 1.0 / GRAM_CONVERSION   # raw → pounds as one multiply
+
+# === Display ===
+PRINT_BATCH = 10          # Readings averaged into each printed line
 
 # === Initialize GPIO Chip ===
 chip = gpiod.Chip('gpiochip0')
 
-# === HX711 Load Cell Interface ===
-class HX711:
-    """Interface for HX711 24-bit ADC (load cell amplifier)."""
-
-    def __init__(self, data_pin, clock_pin, chip):
-        self.data_line = chip.get_line(data_pin)
-        self.clock_line = chip.get_line(clock_pin)
-        self.data_line.request(consumer="hx711", type=gpiod.LINE_REQ_DIR_IN)
-        self.clock_line.request(consumer="hx711", type=gpiod.LINE_REQ_DIR_OUT)
-
-    def read(self):
-        """Read a single 24-bit sample from HX711."""
-        # Wait for chip ready with timeout
-        timeout_count = 0
-        while self.data_line.get_value() and timeout_count < 1000:
-            timeout_count += 1
-            time.sleep(0.00001)  # 1ms delay
-        
-        if timeout_count >= 100000:
-            raise Exception("HX711 timeout waiting for chip ready")
-            
-        value = 0
-        for _ in range(24):
-            self.clock_line.set_value(1)
-            value = value << 1
-            self.clock_line.set_value(0)
-            if self.data_line.get_value():
-                value += 1
-        # 25th pulse sets gain/channel
-        self.clock_line.set_value(1)
-        self.clock_line.set_value(0)
-
-        # Convert to signed 24-bit integer
-        if value & 0x800000:
-            value |= ~((1 << 24) - 1)
-        
-        # CRITICAL: Wait for next conversion to be ready
-        # HX711 needs time to prepare next sample (typically 200ms for gain=128)
-        time.sleep(0.2)  # 200ms delay between reads
-        
-        return value
-
-    def power_down(self):
-        """Power down the HX711."""
-        self.clock_line.set_value(1)
-        time.sleep(0.00006)
-
-    def power_up(self):
-        """Wake up HX711 from power down."""
-        self.clock_line.set_value(0)
-        time.sleep(0.00006)
 
 def main():
     """Main function to continuously read and display load cell values."""
     try:
-        hx = HX711(DATA_PIN, CLOCK_PIN, chip)
+        hx = HX711SPI() if USE_SPI else HX711(DATA_PIN, CLOCK_PIN, chip)
         print("HX711 initialized successfully")
     except Exception as e:
         print(f"Error initializing HX711: {e}")
         return
     
-    print("Load Cell Reader Started")
+    # One wall-clock anchor; each line then only needs a monotonic delta
+    t0_mono = time.monotonic()
+    print(f"Load Cell Reader Started at {datetime.now():%Y-%m-%d %H:%M:%S}")
     print("Press Ctrl+C to stop")
     print("=" * 50)
-    print(f"{'Time':<20} {'Raw Value':<12} {'Force (lb)':<12}")
+    print(f"{'Time (s)':<20} {'Raw Value':<12} {'Force (lb)':<12}")
     print("=" * 50)
     
+    batch = []
     try:
         while True:
             try:
                 # Read raw value from HX711
-                raw_value = hx.read()
-                
+                batch.append(hx.read(timeout=1.0))
+                if len(batch) < PRINT_BATCH:
+                    continue
+
+                # One averaged line per batch keeps terminal I/O off the read path
+                raw_value = sum(batch) / len(batch)
+                batch.clear()
+
                 # Convert to force in pounds
-                force_lb = (raw_value - INITIAL_OFFSET) / GRAM_CONVERSION
+                force_lb = (raw_value - INITIAL_OFFSET) * _INV_CONV
                 
-                # Get current timestamp
-                current_time = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+                # Seconds since start (no per-line wall-clock formatting)
+                elapsed = time.monotonic() - t0_mono
                 
                 # Print formatted output
-                print(f"{current_time:<20} {raw_value:<12} {force_lb:<12.3f}")
+                print(f"{elapsed:<20.3f} {raw_value:<12.0f} {force_lb:<12.3f}")
                 
             except Exception as e:
                 print(f"Error reading load cell: {e}")
@@ -107,11 +72,7 @@ def main():
                 except:
                     pass
                 time.sleep(0.5)  # Wait before retrying
-            
-            # Small delay to prevent overwhelming the terminal
-            # Note: HX711.read() already includes 100ms delay
-            time.sleep(0.05)  # Additional 50ms for terminal display
-            
+
     except KeyboardInterrupt:
         print("\nStopping load cell reader...")
     finally:
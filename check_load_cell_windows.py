@@ -19,6 +19,7 @@ class MockGPIO:
 # === Calibration Parameters ===
 GRAM_CONVERSION = 75000   # Conversion factor (raw ADC → pounds)
 INITIAL_OFFSET = 25000    # Zero-load offset
+_INV_CONV = 1.0 / GRAM_CONVERSION   # raw → pounds as one multiply
 
 def main():
     """Main function to continuously read and display simulated load cell values."""
@@ -34,10 +35,12 @@ def main():
         print(f"Error initializing Mock HX711: {e}")
         return
     
-    print("Load Cell Reader Started (SIMULATION)")
+    # One wall-clock anchor; each line then only needs an integer monotonic read
+    t0_ns = time.monotonic_ns()
+    print(f"Load Cell Reader Started (SIMULATION) at {datetime.now():%Y-%m-%d %H:%M:%S}")
     print("Press Ctrl+C to stop")
     print("=" * 50)
-    print(f"{'Time':<20} {'Raw Value':<12} {'Force (lb)':<12}")
+    print(f"{'Time (s)':<20} {'Raw Value':<12} {'Force (lb)':<12}")
     print("=" * 50)
     
     try:
@@ -47,13 +50,13 @@ def main():
                 raw_value = mock_hx.read()
                 
                 # Convert to force in pounds
-                force_lb = (raw_value - INITIAL_OFFSET) / GRAM_CONVERSION
+                force_lb = (raw_value - INITIAL_OFFSET) * _INV_CONV
                 
-                # Get current timestamp
-                current_time = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+                # Milliseconds since start (formatted as seconds only when printed)
+                elapsed_ms = (time.monotonic_ns() - t0_ns) // 1_000_000
                 
                 # Print formatted output
-                print(f"{current_time:<20} {raw_value:<12} {force_lb:<12.3f}")
+                print(f"{elapsed_ms / 1000:<20.3f} {raw_value:<12} {force_lb:<12.3f}")
                 
             except Exception as e:
                 print(f"Error reading load cell: {e}")
@@ -2,6 +2,8 @@ import gpiod
 import time
 from datetime import datetime
 
+from hx711_driver import HX711
+
 # === GPIO Pin Assignments ===
 DATA_PIN = 2       # HX711 Data pin
 CLOCK_PIN = 3       # HX711 Clock pin
@@ -9,19 +11,17 @@ CLOCK_PIN = 3       # HX711 Clock pin
 # === Calibration Parameters ===
 GRAM_CONVERSION = 75000   # Conversion factor (raw ADC → pounds)
 INITIAL_OFFSET = 25000    # Zero-load offset
+_INV_CONV = 1.0 / GRAM_CONVERSION   # raw → pounds as one multiply
 
 # === Initialize GPIO Chip ===
 chip = gpiod.Chip('gpiochip0')
 
 # === Enhanced HX711 Load Cell Interface with Debugging ===
-class HX711Debug:
+class HX711Debug(HX711):
     """Enhanced HX711 interface with comprehensive debugging."""
 
-    def __init__(self, data_pin, clock_pin, chip):
-        self.data_line = chip.get_line(data_pin)
-        self.clock_line = chip.get_line(clock_pin)
-        self.data_line.request(consumer="hx711_debug", type=gpiod.LINE_REQ_DIR_IN)
-        self.clock_line.request(consumer="hx711_debug", type=gpiod.LINE_REQ_DIR_OUT)
+    def __init__(self, data_pin, clock_pin, chip, verbose=True):
+        super().__init__(data_pin, clock_pin, chip, consumer="hx711_debug", verbose=verbose)
         
         # Initialize clock to LOW
         self.clock_line.set_value(0)
@@ -46,32 +46,34 @@ class HX711Debug:
         print("Power cycle complete")
 
     def read_with_debug(self, max_wait_time=2.0):
-        """Read HX711 with detailed debugging information."""
-        print("Starting HX711 read...")
+        """
+        Read HX711 with detailed debugging information.
+        Debug lines are queued while reading and printed together afterwards.
+        """
+        note = self._note
+        note("Starting HX711 read...")
         
         # Check initial data line state
         initial_data_state = self.data_line.get_value()
-        print(f"Initial DATA line state: {initial_data_state}")
+        note("Initial DATA line state: {}", initial_data_state)
         
         if initial_data_state == 0:
-            print("DATA line is LOW - chip appears ready")
+            note("DATA line is LOW - chip appears ready")
         else:
-            print("DATA line is HIGH - waiting for chip ready...")
+            note("DATA line is HIGH - waiting for chip ready...")
         
-        # Wait for chip ready with detailed timing
+        # Wait for chip ready (sleeps on the DATA falling edge, no polling)
         start_time = time.time()
-        timeout_count = 0
-        
-        while self.data_line.get_value() and (time.time() - start_time) < max_wait_time:
-            timeout_count += 1
-            if timeout_count % 100 == 0:  # Print every 100ms
-                elapsed = time.time() - start_time
-                print(f"Still waiting... {elapsed:.2f}s elapsed, DATA={self.data_line.get_value()}")
-            time.sleep(0.001)
+        try:
+            self.wait_for_ready(max_wait_time)
+            timed_out = False
+        except TimeoutError:
+            timed_out = True
         
         elapsed_time = time.time() - start_time
         
-        if elapsed_time >= max_wait_time:
+        if timed_out:
+            self._flush_log()
             print(f"TIMEOUT after {elapsed_time:.2f}s - DATA line still HIGH")
             print("Possible causes:")
             print("  1. HX711 not powered (check VCC connection)")
@@ -81,51 +83,17 @@ class HX711Debug:
             print("  5. Clock line stuck HIGH")
             return None
         
-        print(f"Chip ready after {elapsed_time:.3f}s")
-        
-        # Read 24 bits
-        value = 0
-        print("Reading 24 bits...")
-        
-        for bit in range(24):
-            # Clock HIGH
-            self.clock_line.set_value(1)
-            time.sleep(0.0001)  # Small delay for stability
-            
-            # Shift and read bit
-            value = value << 1
-            if self.data_line.get_value():
-                value += 1
-            
-            # Clock LOW
-            self.clock_line.set_value(0)
-            time.sleep(0.0001)
-            
-            if bit % 8 == 7:  # Print every 8 bits
-                print(f"  Bits {bit-7}-{bit}: {value & 0xFF:08b}")
-        
-        # 25th pulse for gain/channel selection
-        self.clock_line.set_value(1)
-        time.sleep(0.0001)
-        self.clock_line.set_value(0)
-        
-        # Convert to signed 24-bit integer
-        if value & 0x800000:
-            value |= ~((1 << 24) - 1)
+        # Read 24 bits + gain pulse straight after the ready edge
+        value = self._fast_read()
         
-        print(f"Raw value: {value} (0x{value:06x})")
+        note("Chip ready after {:.3f}s", elapsed_time)
+        note("Reading 24 bits...")
+        for bit in range(7, 24, 8):  # Print every 8 bits
+            note("  Bits {}-{}: {:08b}", bit - 7, bit, (value >> (23 - bit)) & 0xFF)
+        note("Raw value: {} (0x{:06x})", value, value)
+        self._flush_log()
         return value
 
-    def power_down(self):
-        """Power down the HX711."""
-        self.clock_line.set_value(1)
-        time.sleep(0.00006)
-
-    def power_up(self):
-        """Wake up HX711 from power down."""
-        self.clock_line.set_value(0)
-        time.sleep(0.00006)
-
 def main():
     """Main function with comprehensive debugging."""
     print("=== HX711 Load Cell Debugger ===")
@@ -162,7 +130,7 @@ def main():
     try:
         raw_value = hx.read_with_debug()
         if raw_value is not None:
-            force_lb = (raw_value - INITIAL_OFFSET) / GRAM_CONVERSION
+            force_lb = (raw_value - INITIAL_OFFSET) * _INV_CONV
             print(f"SUCCESS! Raw: {raw_value}, Force: {force_lb:.3f} lb")
             
             # Test continuous reading
@@ -170,7 +138,7 @@ def main():
             for i in range(5):
                 raw_value = hx.read_with_debug()
                 if raw_value is not None:
-                    force_lb = (raw_value - INITIAL_OFFSET) / GRAM_CONVERSION
+                    force_lb = (raw_value - INITIAL_OFFSET) * _INV_CONV
                     print(f"   Sample {i+1}: Raw={raw_value}, Force={force_lb:.3f} lb")
                 else:
                     print(f"   Sample {i+1}: FAILED")
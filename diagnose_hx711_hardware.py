@@ -1,7 +1,10 @@
+import argparse
 import gpiod
 import time
 from datetime import datetime
 
+from hx711_driver import HX711
+
 # === GPIO Pin Assignments ===
 DATA_PIN = 2       # HX711 Data pin
 CLOCK_PIN = 3       # HX711 Clock pin
@@ -9,14 +12,11 @@ CLOCK_PIN = 3       # HX711 Clock pin
 # === Initialize GPIO Chip ===
 chip = gpiod.Chip('gpiochip0')
 
-class HX711Diagnostic:
+class HX711Diagnostic(HX711):
     """Enhanced HX711 diagnostic with hardware testing."""
 
-    def __init__(self, data_pin, clock_pin, chip):
-        self.data_line = chip.get_line(data_pin)
-        self.clock_line = chip.get_line(clock_pin)
-        self.data_line.request(consumer="hx711_diag", type=gpiod.LINE_REQ_DIR_IN)
-        self.clock_line.request(consumer="hx711_diag", type=gpiod.LINE_REQ_DIR_OUT)
+    def __init__(self, data_pin, clock_pin, chip, verbose=True):
+        super().__init__(data_pin, clock_pin, chip, consumer="hx711_diag", verbose=verbose)
         
         # Initialize clock to LOW
         self.clock_line.set_value(0)
@@ -32,9 +32,9 @@ class HX711Diagnostic:
         print("Testing CLOCK pin (output)...")
         for i in range(5):
             self.clock_line.set_value(1)
-            time.sleep(0.01)
+            time.sleep(0.001)
             self.clock_line.set_value(0)
-            time.sleep(0.01)
+            time.sleep(0.001)
         print("CLOCK pin test complete")
         
         # Test DATA pin (input)
@@ -42,7 +42,7 @@ class HX711Diagnostic:
         for i in range(5):
             data_val = self.data_line.get_value()
             print(f"  DATA pin value: {data_val}")
-            time.sleep(0.1)
+            time.sleep(0.001)
         print("DATA pin test complete")
 
     def test_hx711_communication(self):
@@ -62,18 +62,16 @@ class HX711Diagnostic:
         print("2. Attempting single read with timing analysis...")
         start_time = time.time()
         
-        # Wait for ready with detailed feedback
-        timeout_count = 0
-        while self.data_line.get_value() and timeout_count < 2000:  # 2 second timeout
-            timeout_count += 1
-            if timeout_count % 200 == 0:  # Every 200ms
-                elapsed = time.time() - start_time
-                print(f"   Still waiting... {elapsed:.2f}s, DATA={self.data_line.get_value()}")
-            time.sleep(0.001)
+        # Wait for ready on the DATA falling edge (2 second timeout)
+        try:
+            self.wait_for_ready(2.0)
+            timed_out = False
+        except TimeoutError:
+            timed_out = True
         
         elapsed_time = time.time() - start_time
         
-        if timeout_count >= 2000:
+        if timed_out:
             print(f"   TIMEOUT after {elapsed_time:.2f}s")
             print("   Possible causes:")
             print("     - HX711 not powered (check VCC)")
@@ -82,38 +80,16 @@ class HX711Diagnostic:
             print("     - Clock line stuck HIGH")
             return False
         
-        print(f"   Chip ready after {elapsed_time:.3f}s")
-        
-        # Test 3: Read with bit-by-bit analysis
-        print("3. Reading 24 bits...")
-        value = 0
-        for bit in range(24):
-            # Clock HIGH
-            self.clock_line.set_value(1)
-            time.sleep(0.0001)
-            
-            # Shift and read bit
-            value = value << 1
-            if self.data_line.get_value():
-                value += 1
-            
-            # Clock LOW
-            self.clock_line.set_value(0)
-            time.sleep(0.0001)
-            
-            if bit % 8 == 7:  # Print every 8 bits
-                print(f"   Bits {bit-7}-{bit}: {value & 0xFF:08b}")
-        
-        # 25th pulse
-        self.clock_line.set_value(1)
-        time.sleep(0.0001)
-        self.clock_line.set_value(0)
-        
-        # Convert to signed
-        if value & 0x800000:
-            value |= ~((1 << 24) - 1)
+        # Test 3: Read straight after the ready edge, then report
+        value = self._fast_read()
         
-        print(f"   Raw value: {value} (0x{value:06x})")
+        note = self._note
+        note("   Chip ready after {:.3f}s", elapsed_time)
+        note("3. Reading 24 bits...")
+        for bit in range(7, 24, 8):  # Print every 8 bits
+            note("   Bits {}-{}: {:08b}", bit - 7, bit, (value >> (23 - bit)) & 0xFF)
+        note("   Raw value: {} (0x{:06x})", value, value)
+        self._flush_log()
         
         # Test 4: Check DATA line after read
         print("4. Checking DATA line after read...")
@@ -130,47 +106,18 @@ class HX711Diagnostic:
         for i in range(num_reads):
             print(f"\nRead {i+1}/{num_reads}:")
             
-            # Check DATA line before read
-            data_before = self.data_line.get_value()
-            print(f"  DATA before: {'HIGH' if data_before else 'LOW'}")
-            
-            if data_before:
-                print("  DATA is HIGH - chip not ready, skipping this read")
-                time.sleep(0.2)
-                continue
-            
-            # Try to read
+            # Try to read: one DATA check, then the readout only if it was LOW
             try:
                 start_time = time.time()
-                timeout_count = 0
-                
-                while self.data_line.get_value() and timeout_count < 1000:
-                    timeout_count += 1
-                    time.sleep(0.001)
+                value = self.try_read()
+                elapsed = time.time() - start_time
                 
-                if timeout_count >= 1000:
-                    print("  TIMEOUT - chip not ready")
+                print(f"  DATA before: {'HIGH' if value is None else 'LOW'}")
+                if value is None:
+                    print("  DATA is HIGH - chip not ready, skipping this read")
                     time.sleep(0.2)
                     continue
                 
-                # Read 24 bits
-                value = 0
-                for _ in range(24):
-                    self.clock_line.set_value(1)
-                    value = value << 1
-                    self.clock_line.set_value(0)
-                    if self.data_line.get_value():
-                        value += 1
-                
-                # 25th pulse
-                self.clock_line.set_value(1)
-                self.clock_line.set_value(0)
-                
-                # Convert to signed
-                if value & 0x800000:
-                    value |= ~((1 << 24) - 1)
-                
-                elapsed = time.time() - start_time
                 print(f"  SUCCESS: {value} (took {elapsed:.3f}s)")
                 
                 # Wait different amounts to test timing
@@ -209,18 +156,13 @@ class HX711Diagnostic:
         else:
             print("SUCCESS: DATA is LOW after power cycle")
 
-    def power_down(self):
-        """Power down the HX711."""
-        self.clock_line.set_value(1)
-        time.sleep(0.00006)
-
-    def power_up(self):
-        """Wake up HX711 from power down."""
-        self.clock_line.set_value(0)
-        time.sleep(0.00006)
-
 def main():
     """Main diagnostic function."""
+    parser = argparse.ArgumentParser(description="HX711 hardware diagnostic")
+    parser.add_argument("--full-diag", action="store_true",
+                        help="also run the GPIO pin, continuous reading and power cycle tests")
+    args = parser.parse_args()
+    
     print("=== HX711 Hardware Diagnostic Tool ===")
     print("This will help identify hardware vs software issues")
     print()
@@ -236,11 +178,15 @@ def main():
         return
     
     try:
-        # Run all diagnostic tests
-        hx.test_gpio_pins()
+        # Communication test always; the slower wiring checks only on request
+        if args.full_diag:
+            hx.test_gpio_pins()
         hx.test_hx711_communication()
-        hx.test_continuous_reading()
-        hx.power_cycle_test()
+        if args.full_diag:
+            hx.test_continuous_reading()
+            hx.power_cycle_test()
+        else:
+            print("\n(Run with --full-diag for the GPIO pin, continuous reading and power cycle tests)")
         
         print("\n=== Diagnostic Complete ===")
         print("Review the results above to identify the issue:")
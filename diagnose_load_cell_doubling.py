@@ -8,17 +8,20 @@ by implementing proper HX711 timing and synchronization.
 
 Key improvements:
 1. Proper ready-check with timeout
-2. Correct conversion timing (200ms for gain=128)
+2. Reads paced by the chip's own ready signal (no fixed conversion sleep)
 3. Clock line state management
 4. Detailed logging of read timing
 5. Statistical analysis of readings
 """
 
 import gpiod
+import math
 import time
-import statistics
 from datetime import datetime
-from collections import deque
+
+import numpy as np
+
+from hx711_driver import HX711, HX711Reader, StreamingMedian
 
 # === GPIO Pin Assignments ===
 DATA_PIN = 2       # HX711 Data pin
@@ -27,131 +30,115 @@ CLOCK_PIN = 3       # HX711 Clock pin
 # === Calibration Parameters ===
 GRAM_CONVERSION = 75000   # Conversion factor (raw ADC → pounds)
 INITIAL_OFFSET = 25000    # Zero-load offset
+_INV_CONV = 1.0 / GRAM_CONVERSION   # raw → pounds as one multiply
+
+# === Display ===
+BATCH_PERIOD = 0.5        # Seconds between batches pulled from the reader thread
+MAX_SPS = 80              # HX711 fastest data rate; sizes the run log
+MEDIAN_WINDOW = 5         # Samples in the streaming median column
 
 # === Initialize GPIO Chip ===
 chip = gpiod.Chip('gpiochip0')
 
-class HX711Fixed:
+class HX711Fixed(HX711):
     """Fixed HX711 implementation with proper timing and synchronization."""
     
     def __init__(self, data_pin, clock_pin, chip):
-        self.data_line = chip.get_line(data_pin)
-        self.clock_line = chip.get_line(clock_pin)
-        self.data_line.request(consumer="hx711_fixed", type=gpiod.LINE_REQ_DIR_IN)
-        self.clock_line.request(consumer="hx711_fixed", type=gpiod.LINE_REQ_DIR_OUT)
+        super().__init__(data_pin, clock_pin, chip, consumer="hx711_fixed")
         
         # Initialize clock to LOW state
         self.clock_line.set_value(0)
         time.sleep(0.001)  # Give chip time to initialize
         
         # Timing parameters
-        self.conversion_time = 0.2  # 200ms for gain=128 (default)
-        self.clock_pulse_delay = 0.0001  # 100µs between clock pulses
         self.ready_timeout = 2.0  # 2 second timeout for ready check
         
         print(f"HX711 Fixed initialized: DATA={data_pin}, CLOCK={clock_pin}")
-        print(f"Conversion time: {self.conversion_time}s, Clock delay: {self.clock_pulse_delay}s")
     
     def wait_for_ready(self, timeout=None):
-        """Wait for HX711 to be ready (DATA line goes LOW)."""
-        if timeout is None:
-            timeout = self.ready_timeout
-            
-        start_time = time.time()
-        timeout_count = 0
-        
-        while self.data_line.get_value():
-            timeout_count += 1
-            if (time.time() - start_time) >= timeout:
-                elapsed = time.time() - start_time
-                raise TimeoutError(f"HX711 not ready after {elapsed:.2f}s (DATA line stuck HIGH)")
-            time.sleep(0.001)
-        
-        elapsed = time.time() - start_time
-        if timeout_count > 0:
-            print(f"  Waited {elapsed:.3f}s for chip ready ({timeout_count} checks)")
-        
-        return elapsed
-    
-    def read_with_timing(self):
-        """Read HX711 with detailed timing information."""
-        read_start = time.time()
-        
-        # Step 1: Wait for chip ready
-        ready_time = self.wait_for_ready()
-        
-        # Step 2: Read 24 bits
-        bit_read_start = time.time()
-        value = 0
-        
-        for bit in range(24):
-            # Clock HIGH
-            self.clock_line.set_value(1)
-            time.sleep(self.clock_pulse_delay)
-            
-            # Shift and read bit
-            value = value << 1
-            if self.data_line.get_value():
-                value += 1
-            
-            # Clock LOW
-            self.clock_line.set_value(0)
-            time.sleep(self.clock_pulse_delay)
-        
-        bit_read_time = time.time() - bit_read_start
-        
-        # Step 3: 25th pulse for gain/channel selection
-        self.clock_line.set_value(1)
-        time.sleep(self.clock_pulse_delay)
-        self.clock_line.set_value(0)
-        
-        # Step 4: Convert to signed 24-bit integer
-        if value & 0x800000:
-            value |= ~((1 << 24) - 1)
-        
-        total_read_time = time.time() - read_start
-        
-        return {
-            'value': value,
-            'ready_time': ready_time,
-            'bit_read_time': bit_read_time,
-            'total_read_time': total_read_time,
-            'timestamp': read_start
-        }
-    
-    def read(self):
-        """Standard read method for compatibility."""
-        result = self.read_with_timing()
-        return result['value']
-    
-    def power_down(self):
-        """Power down the HX711."""
-        self.clock_line.set_value(1)
-        time.sleep(0.00006)
-    
-    def power_up(self):
-        """Wake up HX711 from power down."""
-        self.clock_line.set_value(0)
-        time.sleep(0.00006)
+        """Wait for DATA to go LOW, defaulting to ready_timeout instead of waiting forever."""
+        super().wait_for_ready(self.ready_timeout if timeout is None else timeout)
+
+class RunLog:
+    """
+    Every sample of a run in parallel, pre-allocated NumPy columns (structure of
+    arrays) instead of one dict per sample; whole-run stats are then single
+    vectorized passes over a contiguous slice.
+    """
 
-def analyze_readings(readings, window_size=10):
-    """Analyze readings for patterns and anomalies."""
-    if len(readings) < window_size:
+    def __init__(self, capacity):
+        self.raw = np.empty(capacity, dtype=np.int32)        # raw ADC value
+        self.ready_t = np.empty(capacity, dtype=np.float32)  # ready wait (s)
+        self.total_t = np.empty(capacity, dtype=np.float32)  # wait + readout (s)
+        self.ts = np.empty(capacity, dtype=np.float64)       # time.perf_counter() at read start
+        self.n = 0
+
+    def append(self, value, ready_time, total_time, timestamp):
+        """Store one sample; silently stops once capacity is reached."""
+        i = self.n
+        if i < len(self.raw):
+            self.raw[i] = value
+            self.ready_t[i] = ready_time
+            self.total_t[i] = total_time
+            self.ts[i] = timestamp
+            self.n = i + 1
+
+
+class RollingStats:
+    """
+    Running sums over the last `window` raw readings (window >= 2).
+
+    Each add() updates the sums by adding the new sample and subtracting the one
+    it evicts from the NumPy ring, so analysis costs O(1) instead of re-scanning.
+    Sums are Python ints, so they stay exact however long the run.
+    """
+
+    def __init__(self, window=10):
+        self.window = window
+        self.values = np.zeros(window, dtype=np.int64)     # ring of raw values
+        self.diffs = np.zeros(window - 1, dtype=np.int64)  # ring of |v[i] - v[i-1]|
+        self.count = 0
+        self.sum = 0
+        self.sumsq = 0
+        self.diff_sum = 0
+        self.prev = None
+
+    def add(self, value):
+        """Push one raw reading into the window."""
+        i = self.count % self.window
+        old = int(self.values[i]) if self.count >= self.window else 0
+        self.sum += value - old
+        self.sumsq += value * value - old * old
+        self.values[i] = value
+
+        if self.prev is not None:
+            k = self.count - 1                 # index of this difference
+            j = k % (self.window - 1)
+            if k >= self.window - 1:
+                self.diff_sum -= int(self.diffs[j])
+            diff = abs(value - self.prev)
+            self.diffs[j] = diff
+            self.diff_sum += diff
+        self.prev = value
+        self.count += 1
+
+
+def analyze_readings(stats):
+    """Analyze the readings in a RollingStats window for patterns and anomalies."""
+    if stats.count < stats.window:
         return "Insufficient data for analysis"
     
-    # Convert to list for analysis
-    values = [r['value'] for r in readings[-window_size:]]
-    forces = [(r['value'] - INITIAL_OFFSET) / GRAM_CONVERSION for r in readings[-window_size:]]
+    # Sample mean/stdev from the running sums (numerator kept in exact ints)
+    n = stats.window
+    mean_val = stats.sum / n
+    std_val = math.sqrt((n * stats.sumsq - stats.sum * stats.sum) / (n * (n - 1)))
     
-    # Calculate statistics
-    mean_val = statistics.mean(values)
-    std_val = statistics.stdev(values) if len(values) > 1 else 0
-    mean_force = statistics.mean(forces)
-    std_force = statistics.stdev(forces) if len(forces) > 1 else 0
+    # Force is a linear map of raw, so its statistics follow directly
+    mean_force = (mean_val - INITIAL_OFFSET) * _INV_CONV
+    std_force = std_val * _INV_CONV
     
     # Check for doubling pattern
-    diffs = [abs(values[i] - values[i-1]) for i in range(1, len(values))]
-    avg_diff = statistics.mean(diffs) if diffs else 0
+    avg_diff = stats.diff_sum / (n - 1)
     
     # Look for suspicious patterns
     analysis = {
@@ -180,74 +167,71 @@ def main():
     
     # Test parameters
     test_duration = 30  # seconds
-    readings = deque(maxlen=100)  # Keep last 100 readings
+    stats = RollingStats(window=10)  # Rolling window for the analysis column
+    log = RunLog(test_duration * MAX_SPS)  # Whole run, for the final timing summary
+    median = StreamingMedian(MEDIAN_WINDOW)  # Outlier-robust column next to Raw
     
     print(f"\nStarting {test_duration}s diagnostic test...")
     print("=" * 80)
-    print(f"{'Time':<8} {'Raw':<10} {'Force':<8} {'Ready':<6} {'Total':<6} {'Analysis'}")
+    print(f"{'Time':<8} {'Raw':<10} {'Median':<10} {'Force':<8} {'Ready':<6} {'Total':<6} {'Analysis'}")
     print("=" * 80)
     
-    start_time = time.time()
-    last_read_time = 0
+    # Background thread reads at the chip's data rate; this loop handles batches
+    reader = HX711Reader(hx, read=hx.read_with_timing)
+    start_time = time.perf_counter()  # same clock as read_with_timing's timestamps
+    reader.start()
+    timeouts_seen = errors_seen = 0
     
     try:
-        while (time.time() - start_time) < test_duration:
-            try:
-                # Read with timing information
-                result = hx.read_with_timing()
-                readings.append(result)
-                
-                # Calculate force
-                force_lb = (result['value'] - INITIAL_OFFSET) / GRAM_CONVERSION
-                
-                # Calculate time since last read
-                time_since_last = result['timestamp'] - last_read_time if last_read_time > 0 else 0
-                last_read_time = result['timestamp']
-                
-                # Analyze recent readings
-                analysis = analyze_readings(readings)
-                
-                # Format output
-                elapsed = time.time() - start_time
-                analysis_str = ""
-                if isinstance(analysis, dict):
-                    if analysis['cv_percent'] > 5:  # High coefficient of variation
-                        analysis_str = f"HIGH_VAR({analysis['cv_percent']:.1f}%)"
-                    if analysis['avg_diff'] > abs(analysis['mean_raw']) * 0.1:  # Large differences
-                        analysis_str += " LARGE_DIFF"
-                
-                print(f"{elapsed:6.1f}s {result['value']:<10} {force_lb:6.2f} "
-                      f"{result['ready_time']:5.3f} {result['total_read_time']:5.3f} {analysis_str}")
-                
-                # Wait for proper conversion time
-                time.sleep(max(0, hx.conversion_time - result['total_read_time']))
-                
-            except TimeoutError as e:
-                print(f"TIMEOUT: {e}")
-                # Try power cycling
-                try:
-                    hx.power_down()
-                    time.sleep(0.1)
-                    hx.power_up()
-                    time.sleep(0.2)
-                except:
-                    pass
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"ERROR: {e}")
-                time.sleep(0.5)
+        while (time.perf_counter() - start_time) < test_duration:
+            time.sleep(BATCH_PERIOD)
+            batch = reader.drain()
+            
+            # Report failures the reader recovered from since the last batch
+            if reader.timeouts != timeouts_seen:
+                timeouts_seen = reader.timeouts
+                print(f"TIMEOUT: {reader.last_error} (power cycled, {timeouts_seen} total)")
+            if reader.errors != errors_seen:
+                errors_seen = reader.errors
+                print(f"ERROR: {reader.last_error}")
+            if not batch:
+                continue
+            
+            for _, (value, ready_time, _, total_time, timestamp) in batch:
+                stats.add(value)
+                log.append(value, ready_time, total_time, timestamp)
+            
+            # Analyze recent readings once per batch
+            analysis = analyze_readings(stats)
+            analysis_str = ""
+            if isinstance(analysis, dict):
+                if analysis['cv_percent'] > 5:  # High coefficient of variation
+                    analysis_str = f"HIGH_VAR({analysis['cv_percent']:.1f}%)"
+                if analysis['avg_diff'] > abs(analysis['mean_raw']) * 0.1:  # Large differences
+                    analysis_str += " LARGE_DIFF"
+            
+            # Format output: one line per sample, analysis on the batch's last line
+            lines = []
+            for _, (value, ready_time, _, total_time, timestamp) in batch:
+                force_lb = (value - INITIAL_OFFSET) * _INV_CONV
+                elapsed = timestamp - start_time
+                lines.append(f"{elapsed:6.1f}s {value:<10} {median.add(value):<10.0f} {force_lb:6.2f} "
+                             f"{ready_time:5.3f} {total_time:5.3f}")
+            lines[-1] += f" {analysis_str}"
+            print("\n".join(lines))
     
     except KeyboardInterrupt:
         print("\nTest interrupted by user")
     
     finally:
+        reader.stop()
+
         # Final analysis
         print("\n" + "=" * 80)
         print("FINAL ANALYSIS:")
         
-        if len(readings) >= 10:
-            final_analysis = analyze_readings(readings)
+        if stats.count >= stats.window:
+            final_analysis = analyze_readings(stats)
             if isinstance(final_analysis, dict):
                 print(f"Mean raw value: {final_analysis['mean_raw']:.0f}")
                 print(f"Standard deviation: {final_analysis['std_raw']:.0f}")
@@ -270,6 +254,14 @@ def main():
                 else:
                     print("✅ STABLE READINGS - No obvious doubling detected")
         
+        # Whole-run read timing from the run log (vectorized over its columns)
+        n = log.n
+        if n >= 2:
+            ready_t, total_t, ts = log.ready_t[:n], log.total_t[:n], log.ts[:n]
+            print(f"\nSamples: {n} ({(n - 1) / (ts[-1] - ts[0]):.1f} SPS)")
+            print(f"Ready wait: mean {ready_t.mean() * 1000:.1f} ms, max {ready_t.max() * 1000:.1f} ms")
+            print(f"Total read: mean {total_t.mean() * 1000:.1f} ms, max {total_t.max() * 1000:.1f} ms")
+        
         try:
             hx.power_down()
             chip.close()
@@ -0,0 +1,367 @@
+"""
+Shared HX711 load cell driver used by the main experiment and check_load_cell.py.
+
+Uses the optional _hx711 C extension (see README) when it has been built, and
+falls back to bit-banging through gpiod otherwise. HX711SPI clocks the chip
+from the SPI peripheral instead (needs the spidev package and SPI wiring).
+"""
+
+import gpiod
+import select
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+
+try:
+    import _hx711  # optional C extension for the 24-bit readout (see README)
+except ImportError:
+    _hx711 = None
+
+try:
+    import spidev  # optional, only needed for HX711SPI
+except ImportError:
+    spidev = None
+
+
+def _make_shift_in(bits):
+    """
+    Build shift_in(cs, dg, hi, lo) -> int with the PD_SCK loop fully unrolled.
+
+    cs/dg are the bound clock setter / data get_value methods and hi/lo the
+    values cs is called with, so each bit is two calls and a shift with no
+    loop counter or attribute lookups.
+    """
+    lines = ["def shift_in(cs, dg, hi=1, lo=0):", "    v = 0"]
+    lines += ["    cs(hi); cs(lo); v = (v << 1) | dg()"] * bits
+    lines.append("    return v")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["shift_in"]
+
+
+_shift_in_24 = _make_shift_in(24)
+_CLOCK_HI = [1]  # LineBulk.set_values arguments, shared so no list is built per edge
+_CLOCK_LO = [0]
+_SIGN_BIT = 0x800000  # bit 23: sign of the two's-complement 24-bit sample
+
+# === SPI framing (MOSI drives PD_SCK, MISO samples DOUT) ===
+# Each 0xAA byte is four PD_SCK pulses; DOUT is valid during the LOW half of
+# each pulse, i.e. on MISO bits 6, 4, 2 and 0. 0x80 adds the 25th (gain) pulse.
+_SPI_FRAME = [0xAA] * 6 + [0x80]
+_SPI_NIBBLE = [
+    ((b >> 3) & 0x8) | ((b >> 2) & 0x4) | ((b >> 1) & 0x2) | (b & 0x1)
+    for b in range(256)
+]
+_SPI_POWER_DOWN = [0xFF] * 10   # PD_SCK HIGH for 80 us at 1 MHz (> 60 us)
+
+
+class StreamingMedian:
+    """
+    Median of the last `window` values. A FIFO tracks what to evict and a
+    bisect-sorted list holds the window, so each add() is O(window) memmove
+    with no re-sort; an outlier moves the median by at most one rank.
+    """
+
+    def __init__(self, window=5):
+        self.window = window
+        self._fifo = deque()
+        self._sorted = []
+
+    def add(self, value):
+        """Insert a value (evicting the oldest once full) and return the current median."""
+        fifo, s = self._fifo, self._sorted
+        if len(fifo) == self.window:
+            del s[bisect_left(s, fifo.popleft())]
+        fifo.append(value)
+        insort(s, value)
+        m = len(s) // 2
+        return s[m] if len(s) & 1 else (s[m - 1] + s[m]) / 2
+
+
+class _NativeLine:
+    """Minimal gpiod.Line stand-in for a line requested through _hx711."""
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    def get_value(self):
+        return _hx711.get_value(self.fd)
+
+    def set_value(self, value):
+        _hx711.set_value(self.fd, value)
+
+
+# === HX711 Load Cell Interface ===
+class HX711:
+    """Interface for HX711 24-bit ADC (load cell amplifier)."""
+
+    def __init__(self, data_pin, clock_pin, chip, consumer="hx711", verbose=False):
+        self._init_state(verbose)
+        if _hx711 is not None:
+            # Native path: the extension owns both lines and clocks the bits in C
+            self._data_fd, self._clock_fd = _hx711.request_lines(
+                f"/dev/{chip.name()}", data_pin, clock_pin, consumer
+            )
+            self.data_line = _NativeLine(self._data_fd)
+            self.clock_line = _NativeLine(self._clock_fd)
+        else:
+            self.data_line = chip.get_line(data_pin)
+            self.clock_line = chip.get_line(clock_pin)
+            # Falling-edge events let the ready wait sleep in select() instead of polling
+            self.data_line.request(consumer=consumer, type=gpiod.LINE_REQ_EV_FALLING_EDGE)
+            self._data_event_fd = self.data_line.event_get_fd()
+            self.clock_line.request(consumer=consumer, type=gpiod.LINE_REQ_DIR_OUT)
+            # Line.set_value wraps a one-line LineBulk on every call; keep one instead
+            self._clock_bulk = gpiod.LineBulk([self.clock_line])
+
+    def _init_state(self, verbose):
+        """Line-independent state shared by every transport (subclasses without GPIO lines call this)."""
+        self.verbose = verbose
+        self._log = []  # (format, args) queued by _note() during a read
+        self._median = None  # StreamingMedian used by read_median()
+        self._data_fd = self._clock_fd = None  # set by the _hx711 native path only
+
+    def wait_for_ready(self, timeout=None):
+        """
+        Block until DATA goes LOW (conversion ready).
+        Raises TimeoutError after `timeout` seconds; None waits forever.
+        """
+        if self._clock_fd is not None:
+            # Sleep on the DATA falling edge instead of spinning on get_value()
+            if timeout is None:
+                while not _hx711.wait_ready(self._data_fd, 1.0):
+                    pass
+            elif not _hx711.wait_ready(self._data_fd, timeout):
+                raise TimeoutError(f"HX711 not ready after {timeout:.2f}s (DATA line stuck HIGH)")
+            return
+
+        # Common case: conversion already complete, no select() needed
+        if not self.data_line.get_value():
+            return
+        fds = [self._data_event_fd]
+        # Drop edges queued while the previous sample was being clocked out
+        while select.select(fds, [], [], 0)[0]:
+            self.data_line.event_read()
+        # Conversion may already be complete
+        if not self.data_line.get_value():
+            return
+        if timeout is None:
+            while not select.select(fds, [], [], 1.0)[0]:
+                pass
+        elif not select.select(fds, [], [], timeout)[0]:
+            raise TimeoutError(f"HX711 not ready after {timeout:.2f}s (DATA line stuck HIGH)")
+        self.data_line.event_read()
+
+    def _note(self, fmt, *args):
+        """Queue a debug line (str.format style); nothing is formatted until _flush_log()."""
+        if __debug__ and self.verbose:
+            self._log.append((fmt, args))
+
+    def _flush_log(self):
+        """Print queued debug lines in one write; call once the read is over."""
+        if self._log:
+            sys.stdout.write("".join(fmt.format(*args) + "\n" for fmt, args in self._log))
+            self._log.clear()
+
+    def read(self, post_delay=0.0, timeout=None):
+        """
+        Read a single 24-bit sample from HX711.
+
+        Args:
+            post_delay (float): Extra sleep after the read (s). The ready wait
+                already paces reads to the chip's data rate, so the default is 0.
+            timeout (float): Ready-wait timeout (s); None waits forever.
+
+        Returns:
+            int: Signed 24-bit raw value from ADC.
+        """
+        self.wait_for_ready(timeout)
+        value = self._fast_read()
+        if post_delay:
+            time.sleep(post_delay)
+        return value
+
+    def try_read(self):
+        """Non-blocking read: the signed sample if DATA is already LOW, else None."""
+        if self.data_line.get_value():
+            return None
+        return self._fast_read()
+
+    def read_with_timing(self, timeout=None):
+        """
+        read() for the diagnostics. Returns a plain tuple (no per-sample dict):
+        (value, ready_time, bit_read_time, total_read_time, timestamp), times in
+        seconds and timestamp from time.perf_counter() at the start of the read.
+        Timed with perf_counter_ns: ns resolution and immune to wall-clock steps.
+        """
+        pc = time.perf_counter_ns
+        read_start = pc()
+        self.wait_for_ready(timeout)
+        bit_read_start = pc()
+        value = self._fast_read()
+        read_end = pc()
+        return (value, (bit_read_start - read_start) * 1e-9, (read_end - bit_read_start) * 1e-9,
+                (read_end - read_start) * 1e-9, read_start * 1e-9)
+
+    def _fast_read(self):
+        """
+        Clock out one sample (24 bits + gain pulse) and return it signed.
+        DATA must already be LOW; use read() unless the ready wait is done by hand.
+        """
+        if self._clock_fd is not None:
+            return _hx711.read_sample(self._data_fd, self._clock_fd)
+
+        cs = self._clock_bulk.set_values
+        value = _shift_in_24(cs, self.data_line.get_value, _CLOCK_HI, _CLOCK_LO)
+        # 25th pulse sets gain/channel
+        cs(_CLOCK_HI)
+        cs(_CLOCK_LO)
+
+        # Convert to signed 24-bit integer (branchless sign extension)
+        return (value ^ _SIGN_BIT) - _SIGN_BIT
+
+    def read_mean(self, samples, timeout=None):
+        """
+        Read `samples` consecutive samples and return their mean (float).
+        With the C extension the whole loop, ready waits included, runs in one call.
+        """
+        if self._clock_fd is not None:
+            return _hx711.read_samples_mean(
+                self._data_fd, self._clock_fd, samples, -1.0 if timeout is None else timeout
+            )
+        read = self.read
+        return sum(read(timeout=timeout) for _ in range(samples)) / samples
+
+    def read_median(self, n=5, timeout=None):
+        """
+        Take one sample and return the median of the last `n` samples (outlier
+        rejection at one conversion per call, unlike averaging n fresh reads).
+        """
+        median = self._median
+        if median is None or median.window != n:
+            median = self._median = StreamingMedian(n)
+        return median.add(self.read(timeout=timeout))
+
+    def power_down(self):
+        """Power down the HX711."""
+        self.clock_line.set_value(1)
+        time.sleep(0.00006)
+
+    def power_up(self):
+        """Wake up HX711 from power down."""
+        self.clock_line.set_value(0)
+        time.sleep(0.00006)
+
+
+# === Background Reader ===
+class HX711Reader(threading.Thread):
+    """
+    Long-lived reader thread: takes samples at the chip's own data rate and
+    queues (time.monotonic_ns(), sample) pairs in a bounded FIFO that the
+    consumer empties in batches with drain(). Timeouts power-cycle the chip
+    and are counted rather than raised.
+    """
+
+    def __init__(self, hx, read=None, maxlen=512, timeout=1.0):
+        super().__init__(name="hx711-reader", daemon=True)
+        self.hx = hx
+        self._read = read if read is not None else (lambda: hx.read(timeout=timeout))
+        self.fifo = deque(maxlen=maxlen)   # oldest samples drop if the consumer falls behind
+        self.timeouts = 0
+        self.errors = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        read = self._read
+        append = self.fifo.append
+        monotonic_ns = time.monotonic_ns
+        stopped = self._stop_event.is_set
+        while not stopped():
+            try:
+                sample = read()
+            except TimeoutError as e:
+                self.timeouts += 1
+                self.last_error = e
+                self.hx.power_down()
+                time.sleep(0.1)
+                self.hx.power_up()
+                time.sleep(0.2)
+                continue
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                time.sleep(0.5)
+                continue
+            append((monotonic_ns(), sample))
+
+    def drain(self):
+        """Pop and return every queued (t_ns, sample), oldest first."""
+        fifo = self.fifo
+        return [fifo.popleft() for _ in range(len(fifo))]
+
+    def stop(self):
+        """Ask the thread to exit after the current read and wait for it."""
+        self._stop_event.set()
+        self.join()
+
+
+# === HX711 over SPI ===
+class HX711SPI(HX711):
+    """
+    HX711 clocked by the SPI peripheral: PD_SCK on MOSI (GPIO10), DOUT on
+    MISO (GPIO9), SCLK unconnected. The whole readout is one xfer2() timed
+    by hardware, so scheduler jitter cannot stretch a PD_SCK pulse.
+    """
+
+    def __init__(self, bus=0, device=0, speed_hz=1_000_000, verbose=False):
+        if spidev is None:
+            raise ImportError("HX711SPI needs the spidev package (sudo apt install python3-spidev)")
+        # No GPIO lines to request, so only the shared state from HX711 is set up
+        self._init_state(verbose)
+
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)
+        self.spi.max_speed_hz = speed_hz   # 1 MHz: 1 us PD_SCK high/low
+        self.spi.mode = 0
+
+    def _data_low(self):
+        """Sample DOUT for one byte with PD_SCK held LOW; True when it stayed LOW."""
+        return self.spi.xfer2([0])[0] == 0
+
+    def wait_for_ready(self, timeout=None):
+        """
+        Poll DOUT over MISO until it goes LOW (the SPI-owned pin has no edge events).
+        Raises TimeoutError after `timeout` seconds; None waits forever.
+        """
+        if self._data_low():
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._data_low():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"HX711 not ready after {timeout:.2f}s (DATA line stuck HIGH)")
+            time.sleep(0.0005)
+
+    def try_read(self):
+        """Non-blocking read: the signed sample if DOUT is already LOW, else None."""
+        return self._fast_read() if self._data_low() else None
+
+    def _fast_read(self):
+        """Clock out one sample (24 bits + gain pulse) in a single transfer and return it signed."""
+        resp = self.spi.xfer2(_SPI_FRAME)
+        value = 0
+        for b in resp[:6]:
+            value = (value << 4) | _SPI_NIBBLE[b]
+        return (value ^ _SIGN_BIT) - _SIGN_BIT
+
+    def power_down(self):
+        """
+        Hold PD_SCK HIGH for >60 us. MOSI idles LOW after the transfer, so the
+        chip powers back up straight away: on SPI this is effectively a reset.
+        """
+        self.spi.xfer2(_SPI_POWER_DOWN)
+
+    def power_up(self):
+        """PD_SCK returns LOW when the SPI transfer ends; nothing to do."""